@@ -1 +1 @@
-__all__ = ["video"]
\ No newline at end of file
+__all__ = ["video","access","spool"]
\ No newline at end of file
@@ -0,0 +1,298 @@
+import os
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+import cv2
+import numpy as np
+from PIL import Image
+
+MAX_HANDLES=4
+MAX_INDEXES=32
+MAX_STRIPS=16
+MAX_FRAME_CACHE_BYTES=192*1024*1024
+RELEASE_WAIT_S=5.0
+SEQ_READ_WINDOW=12 #frames; closer than this we grab forward instead of seeking
+
+_lock=threading.Lock()
+_handles:"OrderedDict[str,_Handle]"=OrderedDict()
+_frames:"OrderedDict[tuple,np.ndarray]"=OrderedDict()
+_frames_bytes=0
+_strips:"OrderedDict[tuple,Image.Image]"=OrderedDict()
+_indexes:"OrderedDict[tuple,list[float]]"=OrderedDict() #file key -> per-frame timestamps (ms)
+_indexing:set[tuple]=set() #file keys with a build in flight
+_jobs:dict[str,set]={} #abs path -> background captures still open on it
+
+def _file_key(path):
+    """(abs path, size, mtime) — changes whenever the file on disk changes."""
+    st=os.stat(path)
+    return (os.path.abspath(path),st.st_size,st.st_mtime_ns)
+
+def _lru_put(cache,key,value,limit):
+    cache[key]=value
+    cache.move_to_end(key)
+    while len(cache)>limit:
+        cache.popitem(last=False)
+
+def _cache_frame(key,rgb):
+    """Insert into the frame cache, evicting oldest entries beyond MAX_FRAME_CACHE_BYTES (caller holds _lock)."""
+    global _frames_bytes
+    old=_frames.pop(key,None)
+    if old is not None:
+        _frames_bytes-=old.nbytes
+    if rgb.nbytes>MAX_FRAME_CACHE_BYTES:
+        return
+    _frames[key]=rgb
+    _frames_bytes+=rgb.nbytes
+    while _frames_bytes>MAX_FRAME_CACHE_BYTES:
+        _,ev=_frames.popitem(last=False)
+        _frames_bytes-=ev.nbytes
+
+def _nearest(stamps,ms):
+    """Index of the timestamp in sorted stamps closest to ms, or None if empty."""
+    if not stamps:
+        return None
+    i=bisect_left(stamps,max(0.0,ms))
+    if i>=len(stamps):
+        return len(stamps)-1
+    if i>0 and (ms-stamps[i-1])<(stamps[i]-ms):
+        i-=1
+    return i
+
+class _Job:
+    """A background pass holding its own capture on a file; release() cancels and waits for it."""
+
+    def __init__(self,path):
+        self.path=os.path.abspath(path)
+        self.cancel=threading.Event()
+        self.done=threading.Event()
+        with _lock:
+            _jobs.setdefault(self.path,set()).add(self)
+
+    def finish(self):
+        with _lock:
+            jobs=_jobs.get(self.path)
+            if jobs is not None:
+                jobs.discard(self)
+                if not jobs:
+                    del _jobs[self.path]
+        self.done.set()
+
+def _build_index(path,key,job):
+    """
+    Walk the stream once with grab() on a separate capture and record each
+    frame's presentation time in ms. Runs in the background so the first seek
+    never waits on a full pass; until it finishes, seeks use the nominal fps.
+    The result is cached per file key, independent of handle lifetime.
+    """
+    stamps=[]
+    complete=False
+    cap=cv2.VideoCapture(path)
+    try:
+        while cap.isOpened() and not job.cancel.is_set() and cap.grab():
+            stamps.append(float(cap.get(cv2.CAP_PROP_POS_MSEC)))
+        complete=not job.cancel.is_set()
+    finally:
+        cap.release()
+        if len(stamps)<2 or stamps[-1]<=stamps[0]:
+            #some backends report 0 for every frame; keep using the nominal rate
+            stamps=[]
+        with _lock:
+            _indexing.discard(key)
+            if complete:
+                _lru_put(_indexes,key,stamps,MAX_INDEXES)
+        job.finish()
+
+class _Handle:
+    """One open cv2.VideoCapture plus its metadata."""
+
+    def __init__(self,path,key):
+        self.path=path
+        self.key=key
+        self.lock=threading.Lock()
+        self.cap=cv2.VideoCapture(path)
+        self.ok=self.cap.isOpened()
+        self.fps=(self.cap.get(cv2.CAP_PROP_FPS) or 0.0) if self.ok else 0.0
+        self.frames=int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0) if self.ok else 0
+        self.pos=0 #index of the next frame cap.read() will return
+        self.index_job=None #background index build started by this handle, if any
+
+    def release(self):
+        """Close the capture and cancel this handle's index build."""
+        job=self.index_job
+        if job is not None:
+            job.cancel.set()
+        with self.lock:
+            self.cap.release()
+            self.ok=False
+
+    def frame_index(self,t_sec):
+        """Index of the frame displayed at t_sec, or None if unknown."""
+        start=False
+        with _lock:
+            stamps=_indexes.get(self.key)
+            if stamps is not None:
+                _indexes.move_to_end(self.key)
+            elif self.ok and self.key not in _indexing:
+                _indexing.add(self.key) #one build per file version
+                start=True
+        if start:
+            job=_Job(self.path)
+            self.index_job=job
+            if not self.ok:
+                job.cancel.set() #released while we were starting
+            threading.Thread(target=_build_index,args=(self.path,self.key,job),daemon=True).start()
+        if stamps:
+            i=_nearest(stamps,t_sec*1000.0)
+        elif self.fps:
+            i=int(round(max(0.0,t_sec)*self.fps))
+        else:
+            return None
+        if self.frames:
+            i=min(i,self.frames-1)
+        return i
+
+    def read(self,idx):
+        """Decode frame idx as BGR, reusing the current position when it is close (caller holds self.lock)."""
+        if idx<self.pos or idx-self.pos>SEQ_READ_WINDOW:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES,idx)
+            self.pos=idx
+        while self.pos<idx:
+            if not self.cap.grab():
+                return None
+            self.pos+=1
+        ok,bgr=self.cap.read()
+        if not ok or bgr is None:
+            return None
+        self.pos+=1
+        return bgr
+
+def _handle(path):
+    """Return the shared handle for path, opening (or reopening after a change) as needed."""
+    key=_file_key(path)
+    with _lock:
+        h=_handles.get(key[0])
+        if h is not None and h.key==key:
+            _handles.move_to_end(key[0])
+            return h
+    #open and probe the container outside _lock so cache hits elsewhere never wait on it
+    new=_Handle(path,key)
+    stale=[]
+    with _lock:
+        h=_handles.get(key[0])
+        if h is not None and h.key==key:
+            stale.append(new) #another thread got there first
+        else:
+            if h is not None:
+                stale.append(h)
+            _handles[key[0]]=h=new
+        _handles.move_to_end(key[0])
+        while len(_handles)>MAX_HANDLES:
+            stale.append(_handles.popitem(last=False)[1])
+    #released outside _lock: readers take h.lock before _lock
+    for old in stale:
+        old.release()
+    return h
+
+def release(path):
+    """
+    Close the cached handle for path and cancel any background pass still reading
+    it, waiting for their captures to close (needed before deleting it on Windows).
+    """
+    ap=os.path.abspath(path)
+    with _lock:
+        h=_handles.pop(ap,None)
+        jobs=list(_jobs.get(ap,()))
+    if h is not None:
+        h.release()
+    for job in jobs:
+        job.cancel.set()
+    for job in jobs:
+        job.done.wait(RELEASE_WAIT_S)
+
+def video_meta(path):
+    """Return (fps, frames, duration_s) from the cached handle."""
+    if not path or not os.path.exists(path):
+        return 0.0,0,0.0
+    h=_handle(path)
+    if not h.ok:
+        return 0.0,0,0.0
+    fps,frames=h.fps,h.frames
+    duration=(frames/fps) if (fps and frames) else 0.0
+    return fps,frames,duration
+
+def frame_at_time(path,t_sec):
+    """Return RGB frame at (approx) time t_sec, or None. Callers get their own writable copy."""
+    if not path or not os.path.exists(path):
+        return None
+    h=_handle(path)
+    if not h.ok:
+        return None
+    idx=h.frame_index(t_sec)
+    if idx is None:
+        return None
+    ck=(h.key,idx)
+    with _lock:
+        rgb=_frames.get(ck)
+        if rgb is not None:
+            _frames.move_to_end(ck)
+            return rgb.copy()
+    with h.lock:
+        if not h.ok:
+            return None
+        bgr=h.read(idx)
+    if bgr is None:
+        return None
+    rgb=cv2.cvtColor(bgr,cv2.COLOR_BGR2RGB)
+    with _lock:
+        _cache_frame(ck,rgb)
+    return rgb.copy()
+
+def strip_at_fps(path,fps_out:int=1,max_frames:int=24,thumb_h:int=80):
+    """
+    Sample frames at fps_out and return a single horizontal strip image.
+    Keeps at most max_frames samples. Memoized per file version. Returns PIL.Image or None.
+    """
+    if not path or not os.path.exists(path):
+        return None
+    sk=(_file_key(path),int(fps_out),int(max_frames),int(thumb_h))
+    with _lock:
+        if sk in _strips:
+            _strips.move_to_end(sk)
+            return _strips[sk]
+
+    #one sequential pass on a private capture, so scrubbing the shared handle is never blocked
+    job=_Job(path)
+    cap=cv2.VideoCapture(path)
+    imgs=[]
+    try:
+        if not cap.isOpened():
+            return None
+        src_fps=cap.get(cv2.CAP_PROP_FPS) or 30.0
+        total=int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        if total==0:
+            return None
+
+        step=max(1.0,src_fps/float(fps_out))
+        keep_at=0.0
+        i=0
+        while len(imgs)<max_frames and not job.cancel.is_set() and cap.grab():
+            if i+1>=keep_at:
+                ok,bgr=cap.retrieve()
+                if not ok:
+                    break
+                rgb=cv2.cvtColor(bgr,cv2.COLOR_BGR2RGB)
+                #resize thumbnail by height
+                fh,fw=rgb.shape[:2]
+                scale=thumb_h/float(fh)
+                imgs.append(cv2.resize(rgb,(int(fw*scale),thumb_h),interpolation=cv2.INTER_AREA))
+                keep_at+=step
+            i+=1
+    finally:
+        cap.release()
+        job.finish()
+    if not imgs or job.cancel.is_set():
+        return None
+    strip=Image.fromarray(np.concatenate(imgs,axis=1))
+    with _lock:
+        _lru_put(_strips,sk,strip,MAX_STRIPS)
+    return strip
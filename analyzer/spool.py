@@ -0,0 +1,98 @@
+import os
+import hashlib
+import tempfile
+import threading
+import time
+
+SPOOL_DIR=os.path.join("tmp","uploads")
+SPOOL_MAX_BYTES=512*1024*1024
+
+_lock=threading.Lock()
+_spooled:dict[tuple,str]={} #(file_id, size, prefix, root) -> spooled path
+
+def _mark_used(path):
+    """
+    Record a use in the file's atime. mtime is left alone: video handles and
+    caches are keyed on it, and bumping it would invalidate them.
+    """
+    try:
+        st=os.stat(path)
+        os.utime(path,ns=(time.time_ns(),st.st_mtime_ns))
+    except OSError:
+        pass
+
+def _evict(root,max_bytes,keep=(),on_evict=None):
+    """
+    Delete least-recently-used spool files (by atime) until the directory fits
+    in max_bytes. Paths in keep and in-flight *.part files are never touched.
+    """
+    keep={os.path.abspath(p) for p in keep if p}
+    entries=[]
+    for name in os.listdir(root):
+        p=os.path.join(root,name)
+        if name.endswith(".part") or not os.path.isfile(p):
+            continue
+        try:
+            st=os.stat(p)
+        except OSError:
+            continue
+        entries.append((st.st_atime_ns,st.st_size,p))
+    total=sum(e[1] for e in entries)
+    for _,size,p in sorted(entries):
+        if total<=max_bytes:
+            break
+        if os.path.abspath(p) in keep:
+            continue
+        if on_evict is not None:
+            on_evict(p)
+        try:
+            os.remove(p)
+            total-=size
+        except OSError:
+            pass
+
+def spool_upload(upload,prefix,root:str=SPOOL_DIR,max_bytes:int=SPOOL_MAX_BYTES,keep=(),on_evict=None):
+    """
+    Store an uploaded video under root, named by content hash so re-uploads and
+    Streamlit reruns reuse the same file. The hash is computed once per upload
+    (keyed on its file_id); every call marks the file as used, and only new
+    uploads write and trigger eviction of the least-recently-used files beyond
+    max_bytes. keep lists other paths still in use by the caller. on_evict(path)
+    runs before a file is removed. Returns the path, or "" if there is no upload.
+    """
+    if upload is None:
+        return ""
+    file_id=getattr(upload,"file_id",None)
+    mk=(file_id,upload.size,prefix,os.path.abspath(root)) if file_id else None
+    if mk is not None:
+        with _lock:
+            path=_spooled.get(mk)
+        if path and os.path.exists(path):
+            _mark_used(path)
+            return path
+
+    data=upload.getvalue()
+    digest=hashlib.sha256(data).hexdigest()[:16]
+    suffix=os.path.splitext(upload.name)[-1].lower() or ".mp4"
+    os.makedirs(root,exist_ok=True)
+    path=os.path.join(root,f"{prefix}-{digest}{suffix}")
+    if os.path.exists(path):
+        _mark_used(path)
+    else:
+        fd,part=tempfile.mkstemp(dir=root,suffix=".part")
+        try:
+            with os.fdopen(fd,"wb") as f:
+                f.write(data)
+            os.replace(part,path)
+        except BaseException:
+            try:
+                os.remove(part)
+            except OSError:
+                pass
+            raise
+        _mark_used(path)
+        _evict(root,max_bytes,keep=[path,*keep],on_evict=on_evict)
+    if mk is not None:
+        with _lock:
+            _spooled[mk]=path
+    return path
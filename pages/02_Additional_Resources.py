@@ -1,8 +1,7 @@
 from pathlib import Path
 import streamlit as st
-import cv2, numpy as np
-from PIL import Image
 import os
+from analyzer import access, spool
 
 BASE=Path(__file__).parent.resolve().parent
 ROOT=Path(__file__).resolve().parent.parent
@@ -30,78 +29,31 @@ with st.sidebar:
 # Helpers
 # -------------------------------
 def _save_upload(upload,prefix):
-    """Save an uploaded video to a temp path and return the path."""
-    if upload is None:
-        return ""
-    os.makedirs("tmp",exist_ok=True)
-    path=os.path.join("tmp",f"{prefix}_{upload.name.replace(' ','_')}")
-    with open(path,"wb") as f:
-        f.write(upload.read())
+    """
+    Spool an uploaded video (content-addressed, size-capped) and return the path.
+    Paths spooled for the other uploaders in this session are kept from eviction,
+    even when their uploader renders later in the script.
+    """
+    own=f"spooled_{prefix}"
+    keep=[p for k,p in st.session_state.items() if k.startswith("spooled_") and k!=own]
+    path=spool.spool_upload(upload,prefix,keep=keep,on_evict=access.release)
+    st.session_state[own]=path
     return path
 
 def _video_meta(path):
     """Return (fps, frames, duration_s)."""
-    cap=cv2.VideoCapture(path)
-    if not cap.isOpened():
-        return 0.0,0,0.0
-    fps=cap.get(cv2.CAP_PROP_FPS) or 0.0
-    frames=int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
-    duration=(frames/fps) if (fps and frames) else 0.0
-    cap.release()
-    return fps,frames,duration
+    return access.video_meta(path)
 
 def _frame_at_time(path,t_sec):
-    """Return RGB frame at (approx) time t_sec, or None."""
-    cap=cv2.VideoCapture(path)
-    if not cap.isOpened():
-        return None
-    cap.set(cv2.CAP_PROP_POS_MSEC,max(0,t_sec*1000.0))
-    ok,bgr=cap.read()
-    cap.release()
-    if not ok or bgr is None:
-        return None
-    return cv2.cvtColor(bgr,cv2.COLOR_BGR2RGB)
+    """Return RGB frame at (approx) time t_sec, or None. The array is a fresh writable copy."""
+    return access.frame_at_time(path,t_sec)
 
 def _strip_at_fps(path,fps_out:int=1,max_frames:int=24,thumb_h:int=80):
     """
     Sample frames at fps_out and return a single horizontal strip image.
     Keeps at most max_frames samples. Returns PIL.Image or None.
     """
-    cap=cv2.VideoCapture(path)
-    if not cap.isOpened():
-        return None
-    src_fps=cap.get(cv2.CAP_PROP_FPS) or 30.0
-    total=int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
-    if total==0:
-        cap.release()
-        return None
-
-    step=max(1.0,src_fps/float(fps_out))
-    keep_at=0.0
-    i=0
-    imgs=[]
-    kept=0
-    while True:
-        ok,bgr=cap.read()
-        if not ok:
-            break
-        if i+1>=keep_at:
-            rgb=cv2.cvtColor(bgr,cv2.COLOR_BGR2RGB)
-            # resize thumbnail by height
-            h,w=rgb.shape[:2]
-            scale=thumb_h/float(h)
-            thumb=cv2.resize(rgb,(int(w*scale),thumb_h),interpolation=cv2.INTER_AREA)
-            imgs.append(thumb)
-            kept+=1
-            keep_at+=step
-            if kept>=max_frames:
-                break
-        i+=1
-    cap.release()
-    if not imgs:
-        return None
-    strip=np.concatenate(imgs,axis=1)
-    return Image.fromarray(strip)
+    return access.strip_at_fps(path,fps_out=fps_out,max_frames=max_frames,thumb_h=thumb_h)
 
 def _md_bytes(text):
     return text.encode("utf-8")
@@ -153,7 +105,7 @@ def render_compare():
             if missing_right:
                 st.warning("Right sample not found. Upload a video instead.")
                 up=st.file_uploader("Upload right video", type=["mp4","mov","m4v","webm"], key="right_up")
-                right_path=_save_upload(up, "right") if up else ""
+                right_path=_save_upload(up,"right") if up else ""
             else:
                 st.success(f"Using sample:{Path(SAMPLE_RIGHT).name}")
 
@@ -0,0 +1,100 @@
+import os
+import time
+import pytest
+
+cv2=pytest.importorskip("cv2")
+np=pytest.importorskip("numpy")
+
+from analyzer import access
+
+def _write_video(path,n=20,fps=10.0,size=(32,24),shade=0):
+    w=cv2.VideoWriter(str(path),cv2.VideoWriter_fourcc(*"MJPG"),fps,size)
+    for i in range(n):
+        w.write(np.full((size[1],size[0],3),(i*10+shade)%256,np.uint8))
+    w.release()
+    return str(path)
+
+def _wait_index(h,timeout=5.0):
+    end=time.time()+timeout
+    while h.key not in access._indexes and time.time()<end:
+        time.sleep(0.01)
+    assert h.key in access._indexes
+
+def test_nearest_picks_closest_timestamp():
+    stamps=[0.0,100.0,200.0,300.0]
+    assert access._nearest(stamps,0)==0
+    assert access._nearest(stamps,140)==1
+    assert access._nearest(stamps,160)==2
+    assert access._nearest(stamps,10_000)==3
+    assert access._nearest(stamps,-5)==0
+    assert access._nearest([],50) is None
+
+def test_frame_index_clamps_and_is_stable_after_indexing(tmp_path):
+    path=_write_video(tmp_path/"a.avi")
+    meta=access.video_meta(path)
+    h=access._handle(path)
+    assert h.frame_index(0.5)==5
+    assert h.frame_index(99.0)==h.frames-1
+    _wait_index(h)
+    assert h.frame_index(0.5)==5
+    assert h.frame_index(99.0)==h.frames-1
+    assert access.video_meta(path)==meta
+
+def test_index_survives_handle_eviction(tmp_path,monkeypatch):
+    monkeypatch.setattr(access,"MAX_HANDLES",1)
+    builds=[]
+    real=access._build_index
+    def counting(path,key,job):
+        builds.append(key)
+        real(path,key,job)
+    monkeypatch.setattr(access,"_build_index",counting)
+    a=_write_video(tmp_path/"ia.avi")
+    b=_write_video(tmp_path/"ib.avi",shade=5)
+    for _ in range(3):
+        for path in (a,b):
+            h=access._handle(path)
+            h.frame_index(0.5)
+            _wait_index(h)
+    assert sorted(builds)==sorted({access._file_key(a),access._file_key(b)})
+
+def test_release_cancels_background_passes(tmp_path):
+    path=_write_video(tmp_path/"long.avi",n=600)
+    h=access._handle(path)
+    h.frame_index(1.0)
+    access.release(path)
+    assert not h.ok
+    assert os.path.abspath(path) not in access._jobs
+
+def test_handle_reused_until_file_changes(tmp_path):
+    path=_write_video(tmp_path/"b.avi")
+    h1=access._handle(path)
+    assert access._handle(path) is h1
+    st=os.stat(path)
+    os.utime(path,ns=(st.st_atime_ns,st.st_mtime_ns+1_000_000_000))
+    h2=access._handle(path)
+    assert h2 is not h1 and not h1.ok
+    access.release(path)
+    assert not h2.ok
+
+def test_frame_at_time_returns_writable_copies(tmp_path):
+    path=_write_video(tmp_path/"c.avi")
+    f1=access.frame_at_time(path,0.5)
+    f2=access.frame_at_time(path,0.5)
+    assert f1 is not None and f1.flags.writeable
+    f1[:]=0
+    assert f2.any() and access.frame_at_time(path,0.5).any()
+
+def test_frame_cache_is_bounded_by_bytes(tmp_path,monkeypatch):
+    path=_write_video(tmp_path/"d.avi")
+    frame_bytes=24*32*3
+    monkeypatch.setattr(access,"MAX_FRAME_CACHE_BYTES",frame_bytes*3)
+    for t in (0.0,0.3,0.6,0.9,1.2):
+        access.frame_at_time(path,t)
+    assert access._frames_bytes<=frame_bytes*3
+    assert sum(f.nbytes for f in access._frames.values())==access._frames_bytes
+
+def test_strip_is_memoized(tmp_path):
+    path=_write_video(tmp_path/"e.avi",n=30)
+    s1=access.strip_at_fps(path,fps_out=2,max_frames=4,thumb_h=12)
+    assert s1.size==(4*16,12)
+    assert access.strip_at_fps(path,fps_out=2,max_frames=4,thumb_h=12) is s1
@@ -0,0 +1,102 @@
+import os
+import time
+from analyzer import spool
+
+class FakeUpload:
+    def __init__(self,data,name="clip.mp4",file_id="f1"):
+        self.data=data
+        self.name=name
+        self.size=len(data)
+        self.file_id=file_id
+        self.reads=0
+
+    def getvalue(self):
+        self.reads+=1
+        return self.data
+
+def _touch(path,size,mtime):
+    with open(path,"wb") as f:
+        f.write(b"x"*size)
+    os.utime(path,(mtime,mtime))
+
+def test_content_hash_naming_and_dedup(tmp_path):
+    a=spool.spool_upload(FakeUpload(b"same",file_id="a"),"left",root=str(tmp_path))
+    b=spool.spool_upload(FakeUpload(b"same",file_id="b"),"left",root=str(tmp_path))
+    c=spool.spool_upload(FakeUpload(b"other",file_id="c"),"left",root=str(tmp_path))
+    assert a==b!=c
+    assert os.path.basename(a).startswith("left-") and a.endswith(".mp4")
+    assert sorted(os.listdir(tmp_path))==sorted({os.path.basename(a),os.path.basename(c)})
+
+def test_rerun_reuses_path_without_rehash_or_touch(tmp_path):
+    up=FakeUpload(b"video-bytes",file_id="rerun")
+    path=spool.spool_upload(up,"left",root=str(tmp_path))
+    before=os.stat(path).st_mtime_ns
+    for _ in range(3):
+        assert spool.spool_upload(up,"left",root=str(tmp_path))==path
+    assert up.reads==1
+    assert os.stat(path).st_mtime_ns==before
+
+def test_respools_when_file_was_evicted(tmp_path):
+    up=FakeUpload(b"abc",file_id="gone")
+    path=spool.spool_upload(up,"left",root=str(tmp_path))
+    os.remove(path)
+    assert spool.spool_upload(up,"left",root=str(tmp_path))==path
+    assert os.path.exists(path)
+
+def test_no_upload():
+    assert spool.spool_upload(None,"left")==""
+
+def test_evict_oldest_first_until_under_budget(tmp_path):
+    now=time.time()
+    for i,name in enumerate(["a.mp4","b.mp4","c.mp4"]):
+        _touch(tmp_path/name,10,now-100+i)
+    evicted=[]
+    spool._evict(str(tmp_path),20,on_evict=evicted.append)
+    assert sorted(os.listdir(tmp_path))==["b.mp4","c.mp4"]
+    assert [os.path.basename(p) for p in evicted]==["a.mp4"]
+
+def test_evict_respects_keep_and_skips_part_files(tmp_path):
+    now=time.time()
+    _touch(tmp_path/"old.mp4",10,now-300)
+    _touch(tmp_path/"mid.mp4",10,now-200)
+    _touch(tmp_path/"new.mp4",10,now-100)
+    _touch(tmp_path/"inflight.part",100,now-400)
+    spool._evict(str(tmp_path),10,keep=[str(tmp_path/"old.mp4")])
+    assert sorted(os.listdir(tmp_path))==["inflight.part","old.mp4"]
+
+def test_new_upload_does_not_evict_kept_paths(tmp_path):
+    left=spool.spool_upload(FakeUpload(b"L"*10,file_id="l"),"left",root=str(tmp_path),max_bytes=15)
+    right=spool.spool_upload(FakeUpload(b"R"*10,file_id="r"),"right",root=str(tmp_path),max_bytes=15,keep=[left])
+    assert os.path.exists(left) and os.path.exists(right)
+    assert not [n for n in os.listdir(tmp_path) if n.endswith(".part")]
+
+def test_evict_least_recently_used_not_oldest_written(tmp_path):
+    now=time.time()
+    _touch(tmp_path/"old.mp4",10,now-300)
+    _touch(tmp_path/"new.mp4",10,now-100)
+    mtime=os.stat(tmp_path/"old.mp4").st_mtime_ns
+    spool._mark_used(str(tmp_path/"old.mp4"))
+    assert os.stat(tmp_path/"old.mp4").st_mtime_ns==mtime
+    spool._evict(str(tmp_path),10)
+    assert os.listdir(tmp_path)==["old.mp4"]
+
+def test_page_call_order_keeps_other_side(tmp_path):
+    #mirrors the compare page: left spools first, then right, each keeping
+    #whatever the session has already spooled for the other side
+    root=str(tmp_path)
+    session={}
+    def save(up,prefix):
+        keep=[p for k,p in session.items() if k!=prefix]
+        session[prefix]=spool.spool_upload(up,prefix,root=root,max_bytes=15,keep=keep)
+        return session[prefix]
+
+    left=save(FakeUpload(b"L"*10,file_id="l1"),"left")
+    right=save(FakeUpload(b"R"*10,file_id="r1"),"right")
+    assert os.path.exists(left) and os.path.exists(right)
+
+    right_mtime=os.stat(right).st_mtime_ns
+    new_left=save(FakeUpload(b"M"*10,file_id="l2"),"left")
+    assert not os.path.exists(left)
+    assert os.path.exists(new_left) and os.path.exists(right)
+    assert save(FakeUpload(b"R"*10,file_id="r1"),"right")==right
+    assert os.stat(right).st_mtime_ns==right_mtime